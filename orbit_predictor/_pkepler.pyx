@@ -0,0 +1,184 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# MIT License
+#
+# Copyright (c) 2017 Satellogic SA
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+"""Compiled J2 propagation kernel.
+
+Same algorithm as `orbit_predictor.predictors.numerical.pkepler_precomp`,
+which is used instead when this extension is not built. Calling it from
+Python is cheaper than going through the Numba dispatcher.
+
+"""
+from libc.math cimport sin, cos, sqrt, floor, fmod, copysign, fabs, M_PI
+
+import numpy as np
+from sgp4.earth_gravity import wgs84
+
+from orbit_predictor.angles import (
+    INTERP_SECOND_NEWTON_MIN_ECC, MAX_ITERATIONS, STARTER_DANBY_MIN_ECC
+)
+
+cdef double MU_E = wgs84.mu
+cdef int _MAX_ITERATIONS = MAX_ITERATIONS
+cdef double _STARTER_DANBY_MIN_ECC = STARTER_DANBY_MIN_ECC
+cdef double _INTERP_SECOND_NEWTON_MIN_ECC = INTERP_SECOND_NEWTON_MIN_ECC
+
+
+cdef inline double _wrap_angle(double angle) nogil:
+    """Reduces angle to [-pi, pi)."""
+    cdef double wrapped = fmod(angle + M_PI, 2 * M_PI)
+    if wrapped < 0:
+        wrapped += 2 * M_PI
+    return wrapped - M_PI
+
+
+cdef double _M_to_E(double M, double ecc) nogil:
+    """Same as `orbit_predictor.angles.M_to_E`."""
+    cdef double M_wrapped = _wrap_angle(M)
+    cdef double E, E_new = 0.0
+    cdef int ii
+
+    if ecc < _STARTER_DANBY_MIN_ECC:
+        E = M_wrapped + ecc * sin(M_wrapped) / (1 - sin(M_wrapped + ecc) + sin(M_wrapped))
+    else:
+        E = M_wrapped + 0.85 * ecc * copysign(1.0, sin(M_wrapped))
+
+    for ii in range(_MAX_ITERATIONS):
+        E_new = E + (M_wrapped - E + ecc * sin(E)) / (1 - ecc * cos(E))
+        if fabs(E_new - E) <= 1e-15:
+            break
+        E = E_new
+
+    return E_new + (M - M_wrapped)
+
+
+cdef double _M_to_E_interp(double M, double ecc, const double[:] E_grid) nogil:
+    """Same as `orbit_predictor.angles.M_to_E_interp`."""
+    cdef Py_ssize_t size = E_grid.shape[0]
+    cdef Py_ssize_t ii
+    cdef double M_wrapped, idx, frac, E
+
+    if size < 2:
+        return _M_to_E(M, ecc)
+
+    M_wrapped = fmod(M, 2 * M_PI)
+    if M_wrapped < 0:
+        M_wrapped += 2 * M_PI
+    idx = M_wrapped / (2 * M_PI) * (size - 1)
+    ii = <Py_ssize_t> floor(idx)
+    if ii > size - 2:
+        ii = size - 2
+    frac = idx - ii
+    E = E_grid[ii] + frac * (E_grid[ii + 1] - E_grid[ii])
+
+    E = E + (M_wrapped - E + ecc * sin(E)) / (1 - ecc * cos(E))
+    if ecc >= _INTERP_SECOND_NEWTON_MIN_ECC:
+        E = E + (M_wrapped - E + ecc * sin(E)) / (1 - ecc * cos(E))
+
+    return E + (M - M_wrapped)
+
+
+cdef double _M_to_E_warm(double M, double ecc, const double[:] E_grid,
+                         double[:] state) nogil:
+    """Same as `orbit_predictor.angles.M_to_E_warm`, returns only E."""
+    cdef double delta_M = M - state[0]
+    cdef double delta_E, d2, sin_d, cos_d, sinE, cosE, E
+
+    if fabs(delta_M) <= state[4]:
+        delta_E = delta_M / (1 - ecc * state[3])
+        d2 = delta_E * delta_E
+        sin_d = delta_E * (1 - d2 / 6 * (1 - d2 / 20 * (1 - d2 / 42)))
+        cos_d = 1 - d2 / 2 * (1 - d2 / 12 * (1 - d2 / 30 * (1 - d2 / 56)))
+
+        E = state[1] + delta_E
+        sinE = state[2] * cos_d + state[3] * sin_d
+        cosE = state[3] * cos_d - state[2] * sin_d
+        E = E + (M - E + ecc * sinE) / (1 - ecc * cosE)
+    else:
+        E = _M_to_E_interp(M, ecc, E_grid)
+
+    state[0] = M
+    state[1] = E
+    state[2] = sin(E)
+    state[3] = cos(E)
+
+    return E
+
+
+cpdef tuple pkepler_c(double M_0, double M_dot, double raan0, double raan_rate,
+                      double argp0, double argp_rate, double ecc, double inc, double p,
+                      double delta_t_sec, const double[:] E_grid, double[:] state):
+    """Perturbed Kepler problem (only J2), see `pkepler_precomp`.
+
+    Returns position and velocity as arrays, like `pkepler_precomp`.
+
+    """
+    cdef double raan, argp, E, sinE, cosE, denom, sin_ta, cos_ta, radius, v_factor
+    cdef double x_pqw, y_pqw, vx_pqw, vy_pqw
+    cdef double cos_inc, sin_inc, cos_raan, sin_raan, cos_argp, sin_argp
+    cdef double p_x, p_y, p_z, q_x, q_y, q_z
+    cdef double[::1] r, v
+
+    # Update for perturbations
+    raan = raan0 + raan_rate * delta_t_sec
+    argp = argp0 + argp_rate * delta_t_sec
+
+    # New eccentric anomaly
+    E = _M_to_E_warm(M_0 + M_dot * delta_t_sec, ecc, E_grid, state)
+    sinE = state[2]
+    cosE = state[3]
+
+    # Perifocal coordinates
+    denom = 1 - ecc * cosE
+    sin_ta = sqrt(1 - ecc * ecc) * sinE / denom
+    cos_ta = (cosE - ecc) / denom
+
+    radius = p / (1 + ecc * cos_ta)
+    v_factor = sqrt(MU_E / p)
+    x_pqw = radius * cos_ta
+    y_pqw = radius * sin_ta
+    vx_pqw = -v_factor * sin_ta
+    vy_pqw = v_factor * (ecc + cos_ta)
+
+    # Rotation from perifocal to inertial frame
+    cos_inc, sin_inc = cos(inc), sin(inc)
+    cos_raan, sin_raan = cos(raan), sin(raan)
+    cos_argp, sin_argp = cos(argp), sin(argp)
+
+    p_x = cos_raan * cos_argp - sin_raan * sin_argp * cos_inc
+    p_y = sin_raan * cos_argp + cos_raan * sin_argp * cos_inc
+    p_z = sin_argp * sin_inc
+    q_x = -cos_raan * sin_argp - sin_raan * cos_argp * cos_inc
+    q_y = -sin_raan * sin_argp + cos_raan * cos_argp * cos_inc
+    q_z = cos_argp * sin_inc
+
+    position_eci = np.empty(3)
+    velocity_eci = np.empty(3)
+    r = position_eci
+    v = velocity_eci
+    r[0] = p_x * x_pqw + q_x * y_pqw
+    r[1] = p_y * x_pqw + q_y * y_pqw
+    r[2] = p_z * x_pqw + q_z * y_pqw
+    v[0] = p_x * vx_pqw + q_x * vy_pqw
+    v[1] = p_y * vx_pqw + q_y * vy_pqw
+    v[2] = p_z * vx_pqw + q_z * vy_pqw
+
+    return position_eci, velocity_eci
@@ -25,22 +25,40 @@
 """Angles and anomalies.
 
 """
-from math import sin, cos, tan, atan, sqrt
+from math import sin, cos, tan, atan, sqrt, floor, pi, copysign
 
-from orbit_predictor.utils import njit
+import numpy as np
 
+from orbit_predictor.utils import njit
 
-@njit
+MAX_ITERATIONS = 50
+# Above this eccentricity the Danby starter is more robust for Newton iteration
+STARTER_DANBY_MIN_ECC = 0.8
+KEPLER_GRID_SIZE = 4096
+# Newton iterations that reach double precision for each eccentricity upper bound,
+# starting from the same first guess as M_to_E
+FIXED_NEWTON_ITERATIONS = (
+    (0.1, 2), (0.3, 3), (0.5, 4), (0.8, 5), (0.9, 6), (0.95, 7), (0.99, 8)
+)
+# Above this eccentricity interpolating the Kepler equation is not precise enough
+KEPLER_GRID_MAX_ECC = 0.9
+# From this eccentricity the interpolated Kepler equation needs a second Newton step
+INTERP_SECOND_NEWTON_MIN_ECC = 0.3
+# Largest step of eccentric anomaly for the warm start, keeps its series exact
+WARM_START_MAX_DELTA_E = 0.05
+
+
+@njit(inline='always')
 def _kepler_equation(E, M, ecc):
     return E - ecc * sin(E) - M
 
 
-@njit
+@njit(inline='always')
 def _kepler_equation_prime(E, _, ecc):
     return 1 - ecc * cos(E)
 
 
-@njit
+@njit(inline='always')
 def ta_to_E(ta, ecc):
     """Eccentric anomaly from true anomaly.
 
@@ -61,7 +79,7 @@ def ta_to_E(ta, ecc):
     return E
 
 
-@njit
+@njit(inline='always')
 def E_to_ta(E, ecc):
     """True anomaly from eccentric anomaly.
 
@@ -100,21 +118,188 @@ def M_to_E(M, ecc):
 
     Note
     -----
-    Algorithm taken from Vallado 2007, pp. 73.
+    Newton iteration as in Vallado 2007, pp. 73. The mean anomaly is
+    reduced to [-pi, pi] and the iteration starts from
+    E = M + e sin(M) / (1 - sin(M + e) + sin(M)) for moderate eccentricities
+    or from Danby's E = M + 0.85 e sign(sin(M)) otherwise, which takes
+    one or two iterations less than E = M and always converges.
 
     """
-    E = M
-    while True:
-        E_new = E + (M - E + ecc * sin(E)) / (1 - ecc * cos(E))
-        if (E_new == E) or (abs((E_new - E) / E) < 1e-15):
+    M_wrapped = (M + pi) % (2 * pi) - pi
+    if ecc < STARTER_DANBY_MIN_ECC:
+        E = M_wrapped + ecc * sin(M_wrapped) / (1 - sin(M_wrapped + ecc) + sin(M_wrapped))
+    else:
+        E = M_wrapped + 0.85 * ecc * copysign(1.0, sin(M_wrapped))
+
+    for _ in range(MAX_ITERATIONS):
+        sinE, cosE = sin(E), cos(E)
+        E_new = E + (M_wrapped - E + ecc * sinE) / (1 - ecc * cosE)
+        if abs(E_new - E) <= 1e-15:
             break
-        else:
-            E = E_new
+        E = E_new
 
-    return E_new
+    # Keep the same number of revolutions as the input
+    return E_new + (M - M_wrapped)
 
 
-@njit
+def M_to_E_array(M, ecc):
+    """Eccentric anomaly from mean anomaly, vectorized over M.
+
+    Parameters
+    ----------
+    M : ndarray
+        Mean anomaly (rad).
+    ecc : float or ndarray
+        Eccentricity, broadcastable to the shape of M.
+
+    Returns
+    -------
+    E : ndarray
+        Eccentric anomaly.
+
+    Note
+    -----
+    Same Newton iteration as `M_to_E`, but the number of iterations is fixed
+    beforehand from the maximum eccentricity and there is no convergence check,
+    so every element follows exactly the same operations and NumPy can
+    vectorize them. For eccentricities above 0.99 elements are iterated
+    until they converge.
+
+    """
+    M = np.asarray(M, dtype=float)
+    M_wrapped = (M + pi) % (2 * pi) - pi
+    E = np.where(
+        ecc < STARTER_DANBY_MIN_ECC,
+        M_wrapped + ecc * np.sin(M_wrapped) / (1 - np.sin(M_wrapped + ecc) + np.sin(M_wrapped)),
+        M_wrapped + 0.85 * ecc * np.copysign(1.0, np.sin(M_wrapped))
+    )
+
+    ecc_arr = np.asarray(ecc)
+    ecc_max = ecc_arr.max() if ecc_arr.size else 0.0
+    for ecc_limit, iterations in FIXED_NEWTON_ITERATIONS:
+        if ecc_max <= ecc_limit:
+            for _ in range(iterations):
+                E -= (E - ecc * np.sin(E) - M_wrapped) / (1 - ecc * np.cos(E))
+            break
+    else:
+        active = np.ones(E.shape, dtype=bool)
+        for _ in range(MAX_ITERATIONS):
+            delta = (M_wrapped - E + ecc * np.sin(E)) / (1 - ecc * np.cos(E))
+            E = np.where(active, E + delta, E)
+            active &= np.abs(delta) > 1e-15
+            if not active.any():
+                break
+
+    # Keep the same number of revolutions as the input
+    return E + (M - M_wrapped)
+
+
+def kepler_grid(ecc, size=KEPLER_GRID_SIZE):
+    """Eccentric anomaly tabulated over a uniform grid of mean anomaly.
+
+    Parameters
+    ----------
+    ecc : float
+        Eccentricity.
+    size : int, optional
+        Number of points of the grid, covering [0, 2 pi].
+
+    Returns
+    -------
+    E_grid : ndarray
+        Eccentric anomaly (rad) for each point of the grid.
+
+    """
+    M_grid = np.linspace(0, 2 * pi, size)
+    return M_to_E_array(M_grid, ecc)
+
+
+@njit(inline='always')
+def M_to_E_interp(M, ecc, E_grid):
+    """Eccentric anomaly from mean anomaly using a precomputed table.
+
+    Parameters
+    ----------
+    M : float
+        Mean anomaly (rad).
+    ecc : float
+        Eccentricity.
+    E_grid : ndarray
+        Table returned by `kepler_grid` for the same eccentricity,
+        if empty `M_to_E` is used instead.
+
+    Returns
+    -------
+    E : float
+        Eccentric anomaly.
+
+    Note
+    -----
+    The table is linearly interpolated and the result refined with
+    one Newton step, or two from `INTERP_SECOND_NEWTON_MIN_ECC`, which
+    recovers the precision of `M_to_E` (errors below 1e-14 rad) for
+    eccentricities below `KEPLER_GRID_MAX_ECC`.
+
+    """
+    if len(E_grid) < 2:
+        return M_to_E(M, ecc)
+
+    M_wrapped = M % (2 * pi)
+    idx = M_wrapped / (2 * pi) * (len(E_grid) - 1)
+    ii = min(int(floor(idx)), len(E_grid) - 2)
+    frac = idx - ii
+    E = E_grid[ii] + frac * (E_grid[ii + 1] - E_grid[ii])
+
+    E = E + (M_wrapped - E + ecc * sin(E)) / (1 - ecc * cos(E))
+    if ecc >= INTERP_SECOND_NEWTON_MIN_ECC:
+        E = E + (M_wrapped - E + ecc * sin(E)) / (1 - ecc * cos(E))
+
+    # Keep the same number of revolutions as the input
+    return E + (M - M_wrapped)
+
+
+def E_to_ta_array(E, ecc):
+    """True anomaly from eccentric anomaly, vectorized over E.
+
+    Parameters
+    ----------
+    E : ndarray
+        Eccentric anomaly (rad).
+    ecc : float
+        Eccentricity.
+
+    Returns
+    -------
+    ta : ndarray
+        True anomaly (rad).
+
+    """
+    ta = 2 * np.arctan(np.sqrt((1 + ecc) / (1 - ecc)) * np.tan(E / 2))
+    return ta
+
+
+def M_to_ta_array(M, ecc):
+    """True anomaly from mean anomaly, vectorized over M.
+
+    Parameters
+    ----------
+    M : ndarray
+        Mean anomaly (rad).
+    ecc : float
+        Eccentricity.
+
+    Returns
+    -------
+    ta : ndarray
+        True anomaly (rad).
+
+    """
+    E = M_to_E_array(M, ecc)
+    ta = E_to_ta_array(E, ecc)
+    return ta
+
+
+@njit(inline='always')
 def E_to_M(E, ecc):
     """Mean anomaly from eccentric anomaly.
 
@@ -135,7 +320,7 @@ def E_to_M(E, ecc):
     return M
 
 
-@njit
+@njit(inline='always')
 def M_to_ta(M, ecc):
     """True anomaly from mean anomaly.
 
@@ -163,7 +348,95 @@ def M_to_ta(M, ecc):
     return ta
 
 
-@njit
+def warm_start_state(ecc, tol=1e-15):
+    """State for `M_to_E_warm`, with no previous solution.
+
+    Parameters
+    ----------
+    ecc : float
+        Eccentricity.
+    tol : float, optional
+        Maximum error of the warm started eccentric anomaly (rad).
+
+    Returns
+    -------
+    state : ndarray
+        Previous M, E, sin E and cos E, and the largest change of mean
+        anomaly for which the warm start is accurate. The previous M is
+        initially the largest float so that the first call starts cold
+        (kernels are compiled with fastmath, which does not allow NaN).
+
+    """
+    # Error of the first order step is bounded by e / (2 (1 - e)^3) dM^2
+    # and Newton squares it, multiplied by e / (2 (1 - e))
+    if ecc > 0:
+        max_delta_M = (
+            tol / (ecc / (2 * (1 - ecc)) * (ecc / (2 * (1 - ecc) ** 3)) ** 2)
+        ) ** (1 / 4)
+    else:
+        max_delta_M = np.inf
+    max_delta_M = min(max_delta_M, WARM_START_MAX_DELTA_E * (1 - ecc))
+
+    return np.array([np.finfo(float).max, 0.0, 0.0, 1.0, max_delta_M])
+
+
+@njit(inline='always')
+def M_to_E_warm(M, ecc, E_grid, state):
+    """Eccentric anomaly from mean anomaly, starting from the previous solution.
+
+    Parameters
+    ----------
+    M : float
+        Mean anomaly (rad).
+    ecc : float
+        Eccentricity.
+    E_grid : ndarray
+        Table returned by `kepler_grid` for the same eccentricity,
+        if empty `M_to_E` is used instead.
+    state : ndarray
+        Array returned by `warm_start_state`, updated in place.
+
+    Returns
+    -------
+    E, sinE, cosE : float
+        Eccentric anomaly and its sine and cosine.
+
+    Note
+    -----
+    When M is close to the previous one, E is advanced one first order
+    step from the previous solution and refined with one Newton step.
+    The sine and cosine needed by Newton are obtained rotating the
+    previous ones with series of the (small) step, so no trigonometric
+    function is evaluated before the final E. Otherwise `M_to_E_interp`
+    is used.
+
+    """
+    delta_M = M - state[0]
+    if abs(delta_M) <= state[4]:
+        E_prev, sinE_prev, cosE_prev = state[1], state[2], state[3]
+
+        delta_E = delta_M / (1 - ecc * cosE_prev)
+        d2 = delta_E * delta_E
+        sin_d = delta_E * (1 - d2 / 6 * (1 - d2 / 20 * (1 - d2 / 42)))
+        cos_d = 1 - d2 / 2 * (1 - d2 / 12 * (1 - d2 / 30 * (1 - d2 / 56)))
+
+        E = E_prev + delta_E
+        sinE = sinE_prev * cos_d + cosE_prev * sin_d
+        cosE = cosE_prev * cos_d - sinE_prev * sin_d
+        E = E + (M - E + ecc * sinE) / (1 - ecc * cosE)
+    else:
+        E = M_to_E_interp(M, ecc, E_grid)
+
+    sinE, cosE = sin(E), cos(E)
+    state[0] = M
+    state[1] = E
+    state[2] = sinE
+    state[3] = cosE
+
+    return E, sinE, cosE
+
+
+@njit(inline='always')
 def ta_to_M(ta, ecc):
     """Mean anomaly from true anomaly.
 
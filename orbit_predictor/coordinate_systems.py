@@ -107,8 +107,10 @@ def ecef_to_eci(eci_coords, gmst):
     # [X] [C S 0][X]
     # [Y] = [-S C 0][Y]
     # [Z]ecef [0 0 1][Z]e
-    x = (eci_coords[0] * cos(gmst)) - (eci_coords[1] * sin(gmst))
-    y = (eci_coords[0] * (sin(gmst))) + (eci_coords[1] * cos(gmst))
+    sin_gmst = sin(gmst)
+    cos_gmst = cos(gmst)
+    x = (eci_coords[0] * cos_gmst) - (eci_coords[1] * sin_gmst)
+    y = (eci_coords[0] * sin_gmst) + (eci_coords[1] * cos_gmst)
     z = eci_coords[2]
     return x, y, z
 
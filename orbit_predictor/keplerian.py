@@ -33,7 +33,7 @@ from numpy.linalg import norm
 from orbit_predictor.utils import transform, njit, cross
 
 
-@njit
+@njit(inline='always')
 def rv_pqw(k, p, ecc, nu):
     """Returns r and v vectors in perifocal frame.
 
@@ -44,7 +44,7 @@ def rv_pqw(k, p, ecc, nu):
     return position_pqw, velocity_pqw
 
 
-@njit
+@njit(inline='always')
 def coe2rv(k, p, ecc, inc, raan, argp, ta):
     """Converts from classical orbital elements to vectors.
 
@@ -79,6 +79,172 @@ def coe2rv(k, p, ecc, inc, raan, argp, ta):
     return position_eci, velocity_eci
 
 
+@njit(inline='always')
+def rv_pqw_from_E(k, p, ecc, sinE, cosE):
+    """Returns r and v in perifocal frame given the eccentric anomaly.
+
+    Only the first two components are returned, since the third one is zero.
+
+    """
+    denom = 1 - ecc * cosE
+    sin_ta = sqrt(1 - ecc ** 2) * sinE / denom
+    cos_ta = (cosE - ecc) / denom
+
+    radius = p / (1 + ecc * cos_ta)
+    x_pqw = radius * cos_ta
+    y_pqw = radius * sin_ta
+    vx_pqw = -sqrt(k / p) * sin_ta
+    vy_pqw = sqrt(k / p) * (ecc + cos_ta)
+
+    return x_pqw, y_pqw, vx_pqw, vy_pqw
+
+
+@njit(inline='always')
+def coe2rv_from_E(k, p, ecc, inc, raan, argp, sinE, cosE):
+    """Converts from classical orbital elements to vectors, given the eccentric anomaly.
+
+    Same as `coe2rv`, but the true anomaly is replaced by the sine and cosine
+    of the eccentric anomaly, which is what Kepler equation solvers produce.
+    This avoids computing the true anomaly and its trigonometric functions,
+    and the rotation to the inertial frame is done in place.
+
+    Parameters
+    ----------
+    k : float
+        Standard gravitational parameter (km^3 / s^2).
+    p : float
+        Semi-latus rectum or parameter (km).
+    ecc : float
+        Eccentricity.
+    inc : float
+        Inclination (rad).
+    raan : float
+        Longitude of ascending node (rad).
+    argp : float
+        Argument of perigee (rad).
+    sinE : float
+        Sine of the eccentric anomaly.
+    cosE : float
+        Cosine of the eccentric anomaly.
+
+    """
+    x_pqw, y_pqw, vx_pqw, vy_pqw = rv_pqw_from_E(k, p, ecc, sinE, cosE)
+
+    # First two columns of the rotation from perifocal to inertial frame
+    cos_inc, sin_inc = cos(inc), sin(inc)
+    cos_raan, sin_raan = cos(raan), sin(raan)
+    cos_argp, sin_argp = cos(argp), sin(argp)
+
+    p_x = cos_raan * cos_argp - sin_raan * sin_argp * cos_inc
+    p_y = sin_raan * cos_argp + cos_raan * sin_argp * cos_inc
+    p_z = sin_argp * sin_inc
+    q_x = -cos_raan * sin_argp - sin_raan * cos_argp * cos_inc
+    q_y = -sin_raan * sin_argp + cos_raan * cos_argp * cos_inc
+    q_z = cos_argp * sin_inc
+
+    position_eci = np.array([
+        p_x * x_pqw + q_x * y_pqw,
+        p_y * x_pqw + q_y * y_pqw,
+        p_z * x_pqw + q_z * y_pqw,
+    ])
+    velocity_eci = np.array([
+        p_x * vx_pqw + q_x * vy_pqw,
+        p_y * vx_pqw + q_y * vy_pqw,
+        p_z * vx_pqw + q_z * vy_pqw,
+    ])
+
+    return position_eci, velocity_eci
+
+
+def rotation_pqw_to_eci(inc, raan, argp):
+    """Rotation matrix from perifocal to inertial frame.
+
+    All the angles (rad) can be arrays of the same shape, in which case
+    a stack of matrices with shape (..., 3, 3) is returned.
+
+    """
+    if np.ndim(inc) == np.ndim(raan) == np.ndim(argp) == 0:
+        cos_inc, sin_inc = cos(inc), sin(inc)
+        cos_raan, sin_raan = cos(raan), sin(raan)
+        cos_argp, sin_argp = cos(argp), sin(argp)
+
+        return np.array([
+            [cos_raan * cos_argp - sin_raan * sin_argp * cos_inc,
+             -cos_raan * sin_argp - sin_raan * cos_argp * cos_inc,
+             sin_raan * sin_inc],
+            [sin_raan * cos_argp + cos_raan * sin_argp * cos_inc,
+             -sin_raan * sin_argp + cos_raan * cos_argp * cos_inc,
+             -cos_raan * sin_inc],
+            [sin_argp * sin_inc, cos_argp * sin_inc, cos_inc],
+        ])
+
+    cos_inc, sin_inc = np.cos(inc), np.sin(inc)
+    cos_raan, sin_raan = np.cos(raan), np.sin(raan)
+    cos_argp, sin_argp = np.cos(argp), np.sin(argp)
+    cos_inc, sin_inc, cos_raan, sin_raan, cos_argp, sin_argp = np.broadcast_arrays(
+        cos_inc, sin_inc, cos_raan, sin_raan, cos_argp, sin_argp)
+
+    return np.stack([
+        np.stack([
+            cos_raan * cos_argp - sin_raan * sin_argp * cos_inc,
+            -cos_raan * sin_argp - sin_raan * cos_argp * cos_inc,
+            sin_raan * sin_inc,
+        ], axis=-1),
+        np.stack([
+            sin_raan * cos_argp + cos_raan * sin_argp * cos_inc,
+            -sin_raan * sin_argp + cos_raan * cos_argp * cos_inc,
+            -cos_raan * sin_inc,
+        ], axis=-1),
+        np.stack([
+            sin_argp * sin_inc,
+            cos_argp * sin_inc,
+            cos_inc,
+        ], axis=-1),
+    ], axis=-2)
+
+
+def coe2rv_array(k, p, ecc, inc, raan, argp, ta):
+    """Converts from classical orbital elements to vectors, vectorized over time.
+
+    Parameters
+    ----------
+    k : float
+        Standard gravitational parameter (km^3 / s^2).
+    p : float
+        Semi-latus rectum or parameter (km).
+    ecc : float
+        Eccentricity.
+    inc : float
+        Inclination (rad).
+    raan : float or ndarray
+        Longitude of ascending node (rad).
+    argp : float or ndarray
+        Argument of perigee (rad).
+    ta : ndarray
+        True anomaly (rad), of any shape.
+
+    Returns
+    -------
+    position_eci, velocity_eci : ndarray
+        Arrays with the shape of ta plus a last axis of length 3.
+
+    """
+    ta = np.asarray(ta, dtype=float)
+    cos_ta, sin_ta = np.cos(ta), np.sin(ta)
+    zeros = np.zeros_like(ta)
+
+    position_pqw = np.stack([cos_ta, sin_ta, zeros], axis=-1) * (
+        p / (1 + ecc * cos_ta))[..., None]
+    velocity_pqw = np.stack([-sin_ta, ecc + cos_ta, zeros], axis=-1) * sqrt(k / p)
+
+    rotation = np.broadcast_to(
+        rotation_pqw_to_eci(inc, raan, argp), ta.shape + (3, 3))
+    position_eci = np.einsum('...ij,...j->...i', rotation, position_pqw)
+    velocity_eci = np.einsum('...ij,...j->...i', rotation, velocity_pqw)
+
+    return position_eci, velocity_eci
+
+
 @njit
 def rv2coe(k, r, v, tol=1e-8):
     """Converts from vectors to classical orbital elements.
@@ -87,14 +253,16 @@ def rv2coe(k, r, v, tol=1e-8):
     ----------
     k : float
         Standard gravitational parameter (km^3 / s^2).
-    r : ndarray
+    r : array_like
         Position vector (km).
-    v : ndarray
+    v : array_like
         Velocity vector (km / s).
     tol : float, optional
         Tolerance for eccentricity and inclination checks, default to 1e-8.
 
     """
+    r, v = np.asarray(r), np.asarray(v)
+
     h = cross(r, v)
     n = cross([0, 0, 1], h) / norm(h)
     e = ((np.dot(v, v) - k / (norm(r))) * r - np.dot(r, v) * v) / k
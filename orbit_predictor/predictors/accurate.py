@@ -46,6 +46,7 @@ Some stuff won't be trivial to understand, but comments and fixes are welcome
 import datetime as dt
 from functools import lru_cache
 
+import numpy as np
 from sgp4 import ext, model
 from sgp4.earth_gravity import wgs84
 from sgp4.io import twoline2rv
@@ -54,7 +55,7 @@ from sgp4.propagation import _gstime
 from orbit_predictor import coordinate_systems
 from orbit_predictor.utils import reify
 
-from .base import CartesianPredictor, logger
+from .base import CartesianPredictor, PosVel, logger
 
 # Hack Zone be warned
 
@@ -108,10 +109,10 @@ class HighAccuracyTLEPredictor(CartesianPredictor):
                      self.sate_id, when_utc, tle)
         tle_line_1, tle_line_2 = tle.lines
         sgp4_sate = twoline2rv(tle_line_1, tle_line_2, wgs84)
-        timetuple = when_utc.timetuple()[:6]
+        timetuple = list(when_utc.timetuple()[:6])
         timetuple[5] = timetuple[5] + when_utc.microsecond * 1e-6
         position_eci, velocity_eci = sgp4_sate.propagate(*timetuple)
-        return position_eci, velocity_eci
+        return PosVel(np.array(position_eci), np.array(velocity_eci))
 
     def _propagate_ecef(self, when_utc):
         """Return position and velocity in the given date using ECEF coordinate system."""
@@ -26,6 +26,8 @@ import warnings
 from collections import namedtuple
 from math import pi, acos, degrees, radians
 
+import numpy as np
+
 from orbit_predictor.exceptions import NotReachable, PropagationError
 
 from orbit_predictor import coordinate_systems
@@ -47,6 +49,10 @@ def round_datetime(dt_):
     return dt_
 
 
+# Position and velocity vectors (ndarrays), as returned by CartesianPredictor._propagate_eci
+PosVel = namedtuple("PosVel", "pos vel")
+
+
 class Position(namedtuple(
         "Position", ['when_utc', 'position_ecef', 'velocity_ecef', 'error_estimate'])):
 
@@ -143,14 +149,22 @@ class Predictor:
 class CartesianPredictor(Predictor):
 
     def _propagate_eci(self, when_utc=None):
+        """Return position and velocity in the given date using ECI coordinate system.
+
+        Subclasses return a `PosVel` of ndarrays, although any pair of
+        3-element sequences is accepted by `_propagate_ecef`.
+
+        """
         raise NotImplementedError
 
     def _propagate_ecef(self, when_utc=None):
         """Return position and velocity in the given date using ECEF coordinate system."""
         position_eci, velocity_eci = self._propagate_eci(when_utc)
         gmst = gstime_from_datetime(when_utc)
-        position_ecef = coordinate_systems.eci_to_ecef(position_eci, gmst)
-        velocity_ecef = coordinate_systems.eci_to_ecef(velocity_eci, gmst)
+        # Python floats are faster than NumPy scalars for the element-wise rotation,
+        # np.asarray does not copy arrays and keeps accepting tuples
+        position_ecef = coordinate_systems.eci_to_ecef(np.asarray(position_eci).tolist(), gmst)
+        velocity_ecef = coordinate_systems.eci_to_ecef(np.asarray(velocity_eci).tolist(), gmst)
         return position_ecef, velocity_ecef
 
     @reify
@@ -21,37 +21,115 @@
 # SOFTWARE.
 
 import datetime as dt
-from math import degrees, radians, sqrt
+from math import cos, degrees, radians, sin, sqrt
+from numbers import Real
 
 import numpy as np
 from sgp4.earth_gravity import wgs84
 from sgp4.io import twoline2rv
 
 from orbit_predictor import coordinate_systems
-from orbit_predictor.angles import ta_to_M, M_to_ta
-from orbit_predictor.keplerian import rv2coe, coe2rv
+from orbit_predictor.angles import (
+    KEPLER_GRID_MAX_ECC, ta_to_M, M_to_ta_array, M_to_E_interp, M_to_E_warm, kepler_grid,
+    warm_start_state
+)
+from orbit_predictor.keplerian import (
+    rv2coe, coe2rv_array, coe2rv_from_E, rv_pqw_from_E, rotation_pqw_to_eci
+)
 from orbit_predictor.predictors import TLEPredictor
-from orbit_predictor.predictors.base import CartesianPredictor
-from orbit_predictor.utils import gstime_from_datetime, mean_motion
+from orbit_predictor.predictors.base import CartesianPredictor, PosVel
+from orbit_predictor.utils import (
+    gstime_from_datetime, mean_motion, njit, reify, timestamp_from_datetime
+)
 
 MU_E = wgs84.mu
 
 
+@njit('UniTuple(f8[:], 2)(f8, f8, f8, f8, f8, f8, f8, f8, f8[:])',
+      cache=True, fastmath=True, error_model='numpy')
+def kepler_precomp(M_0, n, argp, delta_t_sec, ecc, inc, p, raan, E_grid):
+    """Same as `kepler`, starting from the initial mean anomaly and the mean motion.
+
+    All the arguments are invariants of the orbit except delta_t_sec,
+    so they can be computed once and reused between calls. The Kepler
+    equation is solved using E_grid, see `M_to_E_interp`.
+
+    """
+    # Propagation
+    M = M_0 + n * delta_t_sec
+
+    # New eccentric anomaly
+    E = M_to_E_interp(M, ecc, E_grid)
+
+    # Position and velocity vectors
+    position_eci, velocity_eci = coe2rv_from_E(MU_E, p, ecc, inc, raan, argp, sin(E), cos(E))
+
+    return position_eci, velocity_eci
+
+
+@njit('UniTuple(f8[:], 2)(f8, f8, f8, f8, f8, f8, f8, f8)',
+      cache=True, fastmath=True, error_model='numpy')
 def kepler(argp, delta_t_sec, ecc, inc, p, raan, sma, ta):
     # Initial mean anomaly
     M_0 = ta_to_M(ta, ecc)
 
     # Mean motion
-    n = sqrt(wgs84.mu / sma ** 3)
+    n = sqrt(MU_E / sma ** 3)
 
+    return kepler_precomp(M_0, n, argp, delta_t_sec, ecc, inc, p, raan, np.empty(0))
+
+
+@njit('UniTuple(f8[:], 2)(f8, f8, f8, f8, f8, f8[:, :], f8[:], f8[:])',
+      cache=True, fastmath=True, error_model='numpy')
+def kepler_fast(M_0, n, delta_t_sec, ecc, p, rotation, E_grid, state):
+    """Same as `kepler_precomp`, using a precomputed rotation matrix.
+
+    The rotation from the perifocal to the inertial frame is constant
+    for unperturbed orbits, see `rotation_pqw_to_eci`. The Kepler equation
+    is warm started from the previous call, see `M_to_E_warm`.
+
+    """
     # Propagation
     M = M_0 + n * delta_t_sec
 
+    # New eccentric anomaly
+    E, sinE, cosE = M_to_E_warm(M, ecc, E_grid, state)
+
+    # Position and velocity vectors
+    x_pqw, y_pqw, vx_pqw, vy_pqw = rv_pqw_from_E(MU_E, p, ecc, sinE, cosE)
+
+    position_eci = np.array([
+        rotation[0, 0] * x_pqw + rotation[0, 1] * y_pqw,
+        rotation[1, 0] * x_pqw + rotation[1, 1] * y_pqw,
+        rotation[2, 0] * x_pqw + rotation[2, 1] * y_pqw,
+    ])
+    velocity_eci = np.array([
+        rotation[0, 0] * vx_pqw + rotation[0, 1] * vy_pqw,
+        rotation[1, 0] * vx_pqw + rotation[1, 1] * vy_pqw,
+        rotation[2, 0] * vx_pqw + rotation[2, 1] * vy_pqw,
+    ])
+
+    return position_eci, velocity_eci
+
+
+def kepler_array(argp, delta_t_sec_arr, ecc, inc, p, raan, sma, ta):
+    """Same as `kepler`, vectorized over an array of time differences.
+
+    Returns arrays of shape (N, 3) for position and velocity.
+
+    """
+    # Initial mean anomaly and mean motion are computed only once
+    M_0 = ta_to_M(ta, ecc)
+    n = sqrt(MU_E / sma ** 3)
+
+    # Propagation
+    M_arr = M_0 + n * np.asarray(delta_t_sec_arr, dtype=float)
+
     # New true anomaly
-    ta = M_to_ta(M, ecc)
+    ta_arr = M_to_ta_array(M_arr, ecc)
 
     # Position and velocity vectors
-    position_eci, velocity_eci = coe2rv(MU_E, p, ecc, inc, raan, argp, ta)
+    position_eci, velocity_eci = coe2rv_array(MU_E, p, ecc, inc, raan, argp, ta_arr)
 
     return position_eci, velocity_eci
 
@@ -88,6 +166,19 @@ class KeplerianPredictor(CartesianPredictor):
         self._argp = argp
         self._ta = ta
         self._epoch = epoch
+        self._epoch_ts = timestamp_from_datetime(epoch)
+
+        # Invariants of the orbit, so they are not recomputed on every propagation
+        self._p = sma * (1 - ecc ** 2)
+        self._inc_rad = radians(inc)
+        self._raan_rad = radians(raan)
+        self._argp_rad = radians(argp)
+        self._ta_rad = radians(ta)
+        self._n = sqrt(MU_E / sma ** 3)
+        self._M_0 = ta_to_M(self._ta_rad, ecc)
+
+        # Last solution of the Kepler equation, consecutive calls start from it
+        self._kepler_state = warm_start_state(ecc)
 
     @property
     def sate_id(self):
@@ -98,6 +189,19 @@ class KeplerianPredictor(CartesianPredictor):
     def mean_motion(self):
         return mean_motion(self._sma) * 60  # this speed is in radians/minute
 
+    @reify
+    def _R_pqw2eci(self):
+        """Rotation from the perifocal to the inertial frame, constant without perturbations."""
+        return rotation_pqw_to_eci(self._inc_rad, self._raan_rad, self._argp_rad)
+
+    @reify
+    def _E_grid(self):
+        """Eccentric anomaly tabulated for this orbit, built on first propagation."""
+        if self._ecc < KEPLER_GRID_MAX_ECC:
+            return kepler_grid(self._ecc)
+        else:
+            return np.empty(0)
+
     @classmethod
     def from_tle(cls, sate_id, source, date=None):
         """Returns approximate keplerian elements from TLE.
@@ -123,8 +227,7 @@ class KeplerianPredictor(CartesianPredictor):
         velocity_eci = coordinate_systems.ecef_to_eci(pos.velocity_ecef, gmst)
 
         # Convert position to Keplerian osculating elements
-        p, ecc, inc, raan, argp, ta = rv2coe(
-            wgs84.mu, np.array(position_eci), np.array(velocity_eci))
+        p, ecc, inc, raan, argp, ta = rv2coe(MU_E, position_eci, velocity_eci)
         sma = p / (1 - ecc ** 2)
 
         return cls(sma, ecc, degrees(inc), degrees(raan), degrees(argp), degrees(ta), epoch)
@@ -132,19 +235,49 @@ class KeplerianPredictor(CartesianPredictor):
     def _propagate_eci(self, when_utc):
         """Return position and velocity in the given date using ECI coordinate system.
 
-        """
-        # Orbit parameters
-        sma = self._sma
-        ecc = self._ecc
-        p = sma * (1 - ecc ** 2)
-        inc = radians(self._inc)
-        raan = radians(self._raan)
-        argp = radians(self._argp)
-        ta = radians(self._ta)
+        The date can also be given as a POSIX timestamp, in seconds.
 
-        delta_t_sec = (when_utc - self._epoch).total_seconds()
+        """
+        if isinstance(when_utc, Real):
+            delta_t_sec = when_utc - self._epoch_ts
+        else:
+            delta_t_sec = (when_utc - self._epoch).total_seconds()
 
         # Propagate
-        position_eci, velocity_eci = kepler(argp, delta_t_sec, ecc, inc, p, raan, sma, ta)
+        position_eci, velocity_eci = kepler_fast(
+            self._M_0, self._n, delta_t_sec, self._ecc, self._p, self._R_pqw2eci,
+            self._E_grid, self._kepler_state
+        )
+
+        return PosVel(position_eci, velocity_eci)
+
+    def _propagate_eci_many(self, when_utc_iterable):
+        """Return positions and velocities in the given dates using ECI coordinate system.
+
+        Positions and velocities are returned as arrays of shape (N, 3).
+
+        """
+        delta_t_sec_arr = np.fromiter(
+            ((when_utc - self._epoch).total_seconds() for when_utc in when_utc_iterable),
+            dtype=float
+        )
+
+        return self._propagate_eci_array(delta_t_sec_arr)
+
+    def _propagate_eci_ts(self, ts_arr):
+        """Return positions and velocities in the given timestamps using ECI coordinate system.
+
+        Timestamps are POSIX, in seconds. Positions and velocities are
+        returned as arrays with the shape of ts_arr plus a last axis of length 3.
+
+        """
+        delta_t_sec_arr = np.asarray(ts_arr, dtype=float) - self._epoch_ts
+
+        return self._propagate_eci_array(delta_t_sec_arr)
 
-        return tuple(position_eci), tuple(velocity_eci)
+    def _propagate_eci_array(self, delta_t_sec_arr):
+        """Return positions and velocities for an array of seconds since epoch."""
+        return kepler_array(
+            self._argp_rad, delta_t_sec_arr, self._ecc, self._inc_rad,
+            self._p, self._raan_rad, self._sma, self._ta_rad
+        )
@@ -20,16 +20,26 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from functools import lru_cache
 from math import degrees, radians, sqrt, cos, sin
 import datetime as dt
+from numbers import Real
 
 import numpy as np
 from sgp4.earth_gravity import wgs84
 
+from orbit_predictor.predictors.base import PosVel
 from orbit_predictor.predictors.keplerian import KeplerianPredictor
-from orbit_predictor.angles import ta_to_M, M_to_ta
-from orbit_predictor.keplerian import coe2rv
-from orbit_predictor.utils import njit, raan_from_ltan, float_to_hms
+from orbit_predictor.angles import ta_to_M, M_to_ta_array, M_to_E, M_to_E_array, M_to_E_warm
+from orbit_predictor.keplerian import (
+    coe2rv_array, coe2rv_from_E, rotation_pqw_to_eci, rv_pqw_from_E
+)
+from orbit_predictor.utils import NUMBA_AVAILABLE, njit, prange, raan_from_ltan, float_to_hms
+
+try:
+    from orbit_predictor._pkepler import pkepler_c
+except ImportError:
+    pkepler_c = None
 
 
 OMEGA = 2 * np.pi / (86400 * 365.2421897)  # rad / s
@@ -58,13 +68,77 @@ def sun_sync_plane_constellation(num_satellites, *,
         Reference date for the orbit, (default to today).
 
     """
+    if date is None:
+        date = dt.datetime.today().date()
+
+    # All the satellites share the same orbital plane, only the anomaly changes
+    sma, ecc, inc_deg = _orbital_elements_for_sun_sync(alt_km, ecc, inc_deg)
+    epoch, raan = _epoch_from_ltan(date, ltan_h)
+
     for ta_deg in np.linspace(0, 360, num_satellites, endpoint=False):
-        yield J2Predictor.sun_synchronous(
-            alt_km=alt_km, ecc=ecc, inc_deg=inc_deg, ltan_h=ltan_h, date=date, ta_deg=ta_deg
-        )
+        yield J2Predictor(sma, ecc, inc_deg, raan, 0, ta_deg, epoch)
+
+
+@njit('UniTuple(f8, 3)(f8, f8, f8, f8)',
+      cache=True, fastmath=True, error_model='numpy')
+def j2_secular_rates(n, p, ecc, inc):
+    """Secular rates of change due to J2.
+
+    Returns the rates of the right ascension of the ascending node,
+    the argument of perigee and the mean anomaly (rad / s).
+
+    Notes
+    -----
+    Based on algorithm 64 of Vallado 3rd edition
+
+    """
+    raan_rate = (
+        - (3 * n * R_E_KM ** 2 * J2) / (2 * p ** 2) *
+        cos(inc)
+    )
+    argp_rate = (
+        (3 * n * R_E_KM ** 2 * J2) / (4 * p ** 2) *
+        (4 - 5 * sin(inc) ** 2)
+    )
+    M0_dot = (
+        (3 * n * R_E_KM ** 2 * J2) / (4 * p ** 2) *
+        (2 - 3 * sin(inc) ** 2) * sqrt(1 - ecc ** 2)
+    )
+    M_dot = n + M0_dot
+
+    return raan_rate, argp_rate, M_dot
 
 
-@njit
+@njit('UniTuple(f8[:], 2)(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8, f8[:], f8[:])',
+      cache=True, fastmath=True, error_model='numpy')
+def pkepler_precomp(M_0, M_dot, raan0, raan_rate, argp0, argp_rate, ecc, inc, p,
+                    delta_t_sec, E_grid, state):
+    """Same as `pkepler`, starting from the initial mean anomaly and the secular rates.
+
+    All the arguments are invariants of the orbit except delta_t_sec,
+    so they can be computed once and reused between calls. The Kepler
+    equation is solved using E_grid and warm started from the previous
+    call, see `M_to_E_warm`.
+
+    """
+    # Update for perturbations
+    raan = raan0 + raan_rate * delta_t_sec
+    argp = argp0 + argp_rate * delta_t_sec
+
+    # Propagation
+    M = M_0 + M_dot * delta_t_sec
+
+    # New eccentric anomaly
+    E, sinE, cosE = M_to_E_warm(M, ecc, E_grid, state)
+
+    # Position and velocity vectors
+    position_eci, velocity_eci = coe2rv_from_E(MU_E, p, ecc, inc, raan, argp, sinE, cosE)
+
+    return position_eci, velocity_eci
+
+
+@njit('UniTuple(f8[:], 2)(f8, f8, f8, f8, f8, f8, f8, f8)',
+      cache=True, fastmath=True, error_model='numpy')
 def pkepler(argp, delta_t_sec, ecc, inc, p, raan, sma, ta):
     """Perturbed Kepler problem (only J2)
 
@@ -79,45 +153,211 @@ def pkepler(argp, delta_t_sec, ecc, inc, p, raan, sma, ta):
     # Initial mean anomaly
     M_0 = ta_to_M(ta, ecc)
 
-    # Update for perturbations
-    delta_raan = (
-        - (3 * n * R_E_KM ** 2 * J2) / (2 * p ** 2) *
-        cos(inc) * delta_t_sec
-    )
-    raan = raan + delta_raan
+    # Rates of change due to perturbations
+    raan_rate, argp_rate, M_dot = j2_secular_rates(n, p, ecc, inc)
 
-    delta_argp = (
-        (3 * n * R_E_KM ** 2 * J2) / (4 * p ** 2) *
-        (4 - 5 * sin(inc) ** 2) * delta_t_sec
+    return pkepler_precomp(
+        M_0, M_dot, raan, raan_rate, argp, argp_rate, ecc, inc, p, delta_t_sec,
+        np.empty(0), np.full(5, -1.0)  # Negative maximum step, never warm starts
     )
-    argp = argp + delta_argp
 
-    M0_dot = (
-        (3 * n * R_E_KM ** 2 * J2) / (4 * p ** 2) *
-        (2 - 3 * sin(inc) ** 2) * sqrt(1 - ecc ** 2)
-    )
-    M_dot = n + M0_dot
+
+def pkepler_specialized(M_0, M_dot, raan0, raan_rate, argp0, argp_rate, ecc, inc, p):
+    """Compiles `pkepler_precomp` for the given orbit.
+
+    The orbit invariants are frozen as compile time constants, so the
+    compiler can fold every expression that only depends on them, for
+    example the trigonometric functions of the inclination. Compilation
+    takes a noticeable time and is not cached, so it only pays off for
+    predictors that are propagated many times.
+
+    Returns
+    -------
+    function
+        Receives the time difference in seconds, the Kepler table and the
+        warm start state (see `M_to_E_warm`) and returns position and velocity.
+
+    """
+    @njit('UniTuple(f8[:], 2)(f8, f8[:], f8[:])', fastmath=True, error_model='numpy')
+    def _pkepler(delta_t_sec, E_grid, state):
+        return pkepler_precomp(
+            M_0, M_dot, raan0, raan_rate, argp0, argp_rate, ecc, inc, p, delta_t_sec,
+            E_grid, state
+        )
+
+    return _pkepler
+
+
+def pkepler_array(argp, delta_t_sec_arr, ecc, inc, p, raan, sma, ta):
+    """Perturbed Kepler problem (only J2), vectorized over time.
+
+    Same as `pkepler` but receives an array of time differences and
+    returns arrays of shape (N, 3) for position and velocity.
+
+    """
+    delta_t_sec_arr = np.asarray(delta_t_sec_arr, dtype=float)
+
+    # Mean motion
+    n = sqrt(MU_E / sma ** 3)
+
+    # Initial mean anomaly
+    M_0 = ta_to_M(ta, ecc)
+
+    # Secular rates, constant for the whole array
+    raan_rate, argp_rate, M_dot = j2_secular_rates(n, p, ecc, inc)
 
     # Propagation
-    M = M_0 + M_dot * delta_t_sec
+    raan_arr = raan + raan_rate * delta_t_sec_arr
+    argp_arr = argp + argp_rate * delta_t_sec_arr
+    M_arr = M_0 + M_dot * delta_t_sec_arr
 
     # New true anomaly
-    ta = M_to_ta(M, ecc)
+    ta_arr = M_to_ta_array(M_arr, ecc)
 
     # Position and velocity vectors
-    position_eci, velocity_eci = coe2rv(MU_E, p, ecc, inc, raan, argp, ta)
+    position_eci, velocity_eci = coe2rv_array(MU_E, p, ecc, inc, raan_arr, argp_arr, ta_arr)
 
     return position_eci, velocity_eci
 
 
+@njit('void(f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], '
+      'f8[:, :], f8[:, :, :], f8[:, :, :])',
+      parallel=True, cache=True, fastmath=True, error_model='numpy')
+def pkepler_batch(ecc, inc, raan0, argp0, p, M_0, M_dot, raan_rate, argp_rate,
+                  delta_t_sec, position_eci, velocity_eci):
+    """Perturbed Kepler problem (only J2) for N orbits and M dates.
+
+    The orbit invariants are arrays of length N, delta_t_sec has shape (N, M)
+    and the results are written in place to position_eci and velocity_eci,
+    of shape (N, M, 3). Orbits are distributed between threads.
+
+    """
+    num_orbits, num_dates = delta_t_sec.shape
+    for ii in prange(num_orbits):
+        ecc_i = ecc[ii]
+        p_i = p[ii]
+        cos_inc, sin_inc = cos(inc[ii]), sin(inc[ii])
+
+        for jj in range(num_dates):
+            dt_ij = delta_t_sec[ii, jj]
+
+            # Update for perturbations
+            raan = raan0[ii] + raan_rate[ii] * dt_ij
+            argp = argp0[ii] + argp_rate[ii] * dt_ij
+
+            # Propagation
+            E = M_to_E(M_0[ii] + M_dot[ii] * dt_ij, ecc_i)
+            x_pqw, y_pqw, vx_pqw, vy_pqw = rv_pqw_from_E(MU_E, p_i, ecc_i, sin(E), cos(E))
+
+            # Rotation from perifocal to inertial frame
+            cos_raan, sin_raan = cos(raan), sin(raan)
+            cos_argp, sin_argp = cos(argp), sin(argp)
+
+            p_x = cos_raan * cos_argp - sin_raan * sin_argp * cos_inc
+            p_y = sin_raan * cos_argp + cos_raan * sin_argp * cos_inc
+            p_z = sin_argp * sin_inc
+            q_x = -cos_raan * sin_argp - sin_raan * cos_argp * cos_inc
+            q_y = -sin_raan * sin_argp + cos_raan * cos_argp * cos_inc
+            q_z = cos_argp * sin_inc
+
+            position_eci[ii, jj, 0] = p_x * x_pqw + q_x * y_pqw
+            position_eci[ii, jj, 1] = p_y * x_pqw + q_y * y_pqw
+            position_eci[ii, jj, 2] = p_z * x_pqw + q_z * y_pqw
+            velocity_eci[ii, jj, 0] = p_x * vx_pqw + q_x * vy_pqw
+            velocity_eci[ii, jj, 1] = p_y * vx_pqw + q_y * vy_pqw
+            velocity_eci[ii, jj, 2] = p_z * vx_pqw + q_z * vy_pqw
+
+
 class InvalidOrbitError(Exception):
     pass
 
 
+@lru_cache(maxsize=128)
+def _orbital_elements_for_sun_sync(alt_km, ecc, inc_deg):
+    """Solves the Sun-synchronous condition given two of the parameters.
+
+    Returns semimajor axis, eccentricity and inclination.
+
+    """
+    try:
+        with np.errstate(invalid="raise"):
+            if alt_km is not None and ecc is not None:
+                # Normal case, solve for inclination
+                sma = R_E_KM + alt_km
+                inc_deg = degrees(np.arccos(
+                    (-2 * sma ** (7 / 2) * OMEGA * (1 - ecc ** 2) ** 2)
+                    / (3 * R_E_KM ** 2 * J2 * np.sqrt(MU_E))
+                ))
+
+            elif alt_km is not None and inc_deg is not None:
+                # Not so normal case, solve for eccentricity
+                sma = R_E_KM + alt_km
+                ecc = np.sqrt(
+                    1
+                    - np.sqrt(
+                        (-3 * R_E_KM ** 2 * J2 * np.sqrt(MU_E) * np.cos(radians(inc_deg)))
+                        / (2 * OMEGA * sma ** (7 / 2))
+                    )
+                )
+
+            elif ecc is not None and inc_deg is not None:
+                # Rare case, solve for altitude
+                sma = (-np.cos(radians(inc_deg)) * (3 * R_E_KM ** 2 * J2 * np.sqrt(MU_E))
+                       / (2 * OMEGA * (1 - ecc ** 2) ** 2)) ** (2 / 7)
+
+            else:
+                raise ValueError(
+                    "Exactly two of altitude, eccentricity and inclination must be given"
+                )
+
+    except FloatingPointError:
+        raise InvalidOrbitError("Cannot find Sun-synchronous orbit with given parameters")
+
+    return sma, ecc, inc_deg
+
+
+@lru_cache(maxsize=128)
+def _epoch_from_ltan(date, ltan_h):
+    """Returns epoch and RAAN of the orbit with the given LTAN on the given date.
+
+    """
+    # TODO: Allow change in time or location
+    # Right the epoch is fixed given the LTAN, as well as the sub-satellite point
+    epoch = dt.datetime(date.year, date.month, date.day, *float_to_hms(ltan_h))
+    raan = raan_from_ltan(epoch, ltan_h)
+
+    return epoch, raan
+
+
 class J2Predictor(KeplerianPredictor):
     """Propagator that uses secular variations due to J2.
 
     """
+    def __init__(self, sma, ecc, inc, raan, argp, ta, epoch):
+        super().__init__(sma, ecc, inc, raan, argp, ta, epoch)
+
+        # Secular rates are constant, propagation only scales them by the elapsed time
+        self._raan_rate, self._argp_rate, self._M_dot = j2_secular_rates(
+            self._n, self._p, self._ecc, self._inc_rad)
+
+        # Set by specialize
+        self._pkepler_specialized = None
+
+    def specialize(self):
+        """Compiles a propagation kernel for this orbit, see `pkepler_specialized`.
+
+        Once specialized, the kernel is used for single dates even if the
+        compiled extension is available, although the latter has a lower
+        call overhead. Returns the predictor itself, so it can be chained
+        after the constructor.
+
+        """
+        self._pkepler_specialized = pkepler_specialized(
+            self._M_0, self._M_dot, self._raan_rad, self._raan_rate,
+            self._argp_rad, self._argp_rate, self._ecc, self._inc_rad, self._p
+        )
+        return self
+
     @classmethod
     def sun_synchronous(cls, *, alt_km=None, ecc=None, inc_deg=None, ltan_h=12, date=None,
                         ta_deg=0):
@@ -143,63 +383,142 @@ class J2Predictor(KeplerianPredictor):
         if date is None:
             date = dt.datetime.today().date()
 
-        try:
-            with np.errstate(invalid="raise"):
-                if alt_km is not None and ecc is not None:
-                    # Normal case, solve for inclination
-                    sma = R_E_KM + alt_km
-                    inc_deg = degrees(np.arccos(
-                        (-2 * sma ** (7 / 2) * OMEGA * (1 - ecc ** 2) ** 2)
-                        / (3 * R_E_KM ** 2 * J2 * np.sqrt(MU_E))
-                    ))
-
-                elif alt_km is not None and inc_deg is not None:
-                    # Not so normal case, solve for eccentricity
-                    sma = R_E_KM + alt_km
-                    ecc = np.sqrt(
-                        1
-                        - np.sqrt(
-                            (-3 * R_E_KM ** 2 * J2 * np.sqrt(MU_E) * np.cos(radians(inc_deg)))
-                            / (2 * OMEGA * sma ** (7 / 2))
-                        )
-                    )
+        sma, ecc, inc_deg = _orbital_elements_for_sun_sync(alt_km, ecc, inc_deg)
+        epoch, raan = _epoch_from_ltan(date, ltan_h)
 
-                elif ecc is not None and inc_deg is not None:
-                    # Rare case, solve for altitude
-                    sma = (-np.cos(radians(inc_deg)) * (3 * R_E_KM ** 2 * J2 * np.sqrt(MU_E))
-                           / (2 * OMEGA * (1 - ecc ** 2) ** 2)) ** (2 / 7)
+        return cls(sma, ecc, inc_deg, raan, 0, ta_deg, epoch)
 
-                else:
-                    raise ValueError(
-                        "Exactly two of altitude, eccentricity and inclination must be given"
-                    )
+    def _propagate_eci(self, when_utc=None):
+        """Return position and velocity in the given date using ECI coordinate system.
 
-        except FloatingPointError:
-            raise InvalidOrbitError("Cannot find Sun-synchronous orbit with given parameters")
+        The date can also be given as a POSIX timestamp, in seconds.
 
-        # TODO: Allow change in time or location
-        # Right the epoch is fixed given the LTAN, as well as the sub-satellite point
-        epoch = dt.datetime(date.year, date.month, date.day, *float_to_hms(ltan_h))
-        raan = raan_from_ltan(epoch, ltan_h)
+        """
+        if isinstance(when_utc, Real):
+            delta_t_sec = when_utc - self._epoch_ts
+        else:
+            delta_t_sec = (when_utc - self._epoch).total_seconds()
+
+        # Propagate, using the specialized kernel if requested or the compiled extension
+        if self._pkepler_specialized is not None:
+            return PosVel._make(self._pkepler_specialized(
+                delta_t_sec, self._E_grid, self._kepler_state))
+
+        if pkepler_c is not None:
+            return PosVel._make(pkepler_c(
+                self._M_0, self._M_dot, self._raan_rad, self._raan_rate,
+                self._argp_rad, self._argp_rate, self._ecc, self._inc_rad, self._p,
+                delta_t_sec, self._E_grid, self._kepler_state
+            ))
+
+        position_eci, velocity_eci = pkepler_precomp(
+            self._M_0, self._M_dot, self._raan_rad, self._raan_rate,
+            self._argp_rad, self._argp_rate, self._ecc, self._inc_rad, self._p,
+            delta_t_sec, self._E_grid, self._kepler_state
+        )
 
-        return cls(sma, ecc, inc_deg, raan, 0, ta_deg, epoch)
+        return PosVel(position_eci, velocity_eci)
 
-    def _propagate_eci(self, when_utc=None):
-        """Return position and velocity in the given date using ECI coordinate system.
+    def _propagate_eci_array(self, delta_t_sec_arr):
+        """Return positions and velocities for an array of seconds since epoch."""
+        return pkepler_array(
+            self._argp_rad, delta_t_sec_arr, self._ecc, self._inc_rad,
+            self._p, self._raan_rad, self._sma, self._ta_rad
+        )
+
+
+class J2Constellation:
+    """Set of orbits with secular variations due to J2, propagated together.
+
+    The invariants of each orbit are stored in arrays with one element
+    per satellite, so that the whole constellation is propagated with
+    vectorized operations instead of one predictor at a time.
+
+    """
+    def __init__(self, ecc, inc, raan, argp, p, M_0, M_dot, raan_rate, argp_rate, epoch_ts):
+        """Initializes constellation.
+
+        All the parameters are arrays of the same length, angles are in radians,
+        rates in radians per second and epochs are POSIX timestamps.
+        Use `from_predictors` to build it from existing `J2Predictor` instances.
 
         """
-        # Orbit parameters
-        sma = self._sma
-        ecc = self._ecc
-        p = sma * (1 - ecc ** 2)
-        inc = radians(self._inc)
-        raan = radians(self._raan)
-        argp = radians(self._argp)
-        ta = radians(self._ta)
+        self._ecc = np.asarray(ecc, dtype=float)
+        self._inc = np.asarray(inc, dtype=float)
+        self._raan = np.asarray(raan, dtype=float)
+        self._argp = np.asarray(argp, dtype=float)
+        self._p = np.asarray(p, dtype=float)
+        self._M_0 = np.asarray(M_0, dtype=float)
+        self._M_dot = np.asarray(M_dot, dtype=float)
+        self._raan_rate = np.asarray(raan_rate, dtype=float)
+        self._argp_rate = np.asarray(argp_rate, dtype=float)
+        self._epoch_ts = np.asarray(epoch_ts, dtype=float)
 
-        delta_t_sec = (when_utc - self._epoch).total_seconds()
+    @classmethod
+    def from_predictors(cls, predictors):
+        """Creates constellation from a sequence of `J2Predictor` instances."""
+        def stack(attr):
+            return np.array([getattr(pred, attr) for pred in predictors], dtype=float)
+
+        return cls(
+            stack("_ecc"), stack("_inc_rad"), stack("_raan_rad"), stack("_argp_rad"),
+            stack("_p"), stack("_M_0"), stack("_M_dot"),
+            stack("_raan_rate"), stack("_argp_rate"), stack("_epoch_ts"),
+        )
+
+    def __len__(self):
+        return len(self._ecc)
+
+    def propagate_all(self, ts_arr):
+        """Return positions and velocities of all the satellites using ECI coordinate system.
 
-        # Propagate
-        position_eci, velocity_eci = pkepler(argp, delta_t_sec, ecc, inc, p, raan, sma, ta)
+        Dates are given as POSIX timestamps, in seconds. Positions and velocities
+        are returned as arrays of shape (N, M, 3), for N satellites and M dates.
+
+        """
+        ts_arr = np.asarray(ts_arr, dtype=float)
+        delta_t_sec = ts_arr[None, :] - self._epoch_ts[:, None]
+
+        # Without Numba the kernel would be a Python loop over every orbit and date
+        if not NUMBA_AVAILABLE:
+            return self._propagate_all_array(delta_t_sec)
+
+        position_eci = np.empty(delta_t_sec.shape + (3,))
+        velocity_eci = np.empty(delta_t_sec.shape + (3,))
+        pkepler_batch(
+            self._ecc, self._inc, self._raan, self._argp, self._p, self._M_0, self._M_dot,
+            self._raan_rate, self._argp_rate, delta_t_sec, position_eci, velocity_eci
+        )
 
-        return tuple(position_eci), tuple(velocity_eci)
+        return position_eci, velocity_eci
+
+    def _propagate_all_array(self, delta_t_sec):
+        """Same as `propagate_all` using NumPy operations, from seconds since each epoch."""
+        # Update for perturbations
+        raan = self._raan[:, None] + self._raan_rate[:, None] * delta_t_sec
+        argp = self._argp[:, None] + self._argp_rate[:, None] * delta_t_sec
+
+        # Propagation
+        M = self._M_0[:, None] + self._M_dot[:, None] * delta_t_sec
+        ecc = np.broadcast_to(self._ecc[:, None], M.shape)
+        E = M_to_E_array(M.ravel(), ecc.ravel()).reshape(M.shape)
+        sinE, cosE = np.sin(E), np.cos(E)
+
+        # Perifocal coordinates
+        denom = 1 - ecc * cosE
+        sin_ta = np.sqrt(1 - ecc ** 2) * sinE / denom
+        cos_ta = (cosE - ecc) / denom
+        p = self._p[:, None]
+        radius = p / (1 + ecc * cos_ta)
+        zeros = np.zeros_like(E)
+
+        position_pqw = np.stack([radius * cos_ta, radius * sin_ta, zeros], axis=-1)
+        velocity_pqw = np.stack(
+            [-np.sqrt(MU_E / p) * sin_ta, np.sqrt(MU_E / p) * (ecc + cos_ta), zeros], axis=-1)
+
+        # Position and velocity vectors
+        rotation = rotation_pqw_to_eci(self._inc[:, None], raan, argp)
+        position_eci = np.einsum('nmij,nmj->nmi', rotation, position_pqw)
+        velocity_eci = np.einsum('nmij,nmj->nmi', rotation, velocity_pqw)
+
+        return position_eci, velocity_eci
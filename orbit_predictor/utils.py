@@ -32,10 +32,14 @@ from sgp4.propagation import _gstime
 
 # Inspired in https://github.com/poliastro/poliastro/blob/88edda8/src/poliastro/jit.py
 try:
-    from numba import njit
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
 except ImportError:
     import inspect
 
+    NUMBA_AVAILABLE = False
+    prange = range
+
     def njit(first=None, *args, **kwargs):
         """Identity JIT, returns unchanged function."""
         def _jit(f):
@@ -50,6 +54,7 @@ except ImportError:
 # http://www.mathworks.com/matlabcentral/fileexchange/23051-vectorized-solar-azimuth-and-elevation-estimation
 
 DECEMBER_31TH_1999_MIDNIGHT_JD = 2451543.5
+UNIX_EPOCH = dt.datetime(1970, 1, 1)
 
 
 def compose(*functions):
@@ -326,6 +331,14 @@ def gstime_from_datetime(when_utc):
     return _gstime(jday(*timelist))
 
 
+def timestamp_from_datetime(when_utc):
+    """Returns POSIX timestamp in seconds, naive datetimes are assumed to be UTC"""
+    if when_utc.tzinfo is None:
+        return (when_utc - UNIX_EPOCH).total_seconds()
+    else:
+        return when_utc.timestamp()
+
+
 def float_to_hms(hour):
     rem, hour = modf(hour)
     rem, minute = modf(rem * 60)
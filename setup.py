@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 import os.path
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
 
 # Copyright 2017 Satellogic SA.
 
@@ -10,6 +10,21 @@ version = {}
 with open(os.path.join("orbit_predictor", "version.py")) as fp:
     exec(fp.read(), version)
 
+# The compiled propagation kernel is optional, pure Python (or Numba) is used otherwise.
+# Cython is declared in pyproject.toml, and a failure to compile (for example without
+# a C compiler) only skips the extension
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize([
+        Extension("orbit_predictor._pkepler", [os.path.join("orbit_predictor", "_pkepler.pyx")])
+    ])
+    # cythonize does not copy this flag from the original extensions
+    for ext in ext_modules:
+        ext.optional = True
+
 
 setup(
     name='orbit-predictor',
@@ -19,6 +34,7 @@ setup(
     description='Python library to propagate satellite orbits.',
     long_description=open('README.rst').read(),
     packages=find_packages(exclude=["tests"]),
+    ext_modules=ext_modules,
     license="MIT",
     url='https://github.com/satellogic/orbit-predictor',
     # Keywords to get found easily on PyPI results,etc.
@@ -34,13 +50,13 @@ setup(
         'Programming Language :: Python :: 3',
     ],
     install_requires=[
-        'numpy>=1.8.2',
+        'numpy>=1.10',
         'sgp4',
         'requests',
     ],
     extras_require={
         "fast": [
-            "numba>=0.38",
+            "numba>=0.47",
             "scipy>=0.16",
         ],
         "dev": [
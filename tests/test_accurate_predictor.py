@@ -24,10 +24,11 @@ import datetime as dt
 from unittest import TestCase, mock
 
 import logassert
+import numpy as np
 from hypothesis import example, given, settings
 from hypothesis.strategies import floats, tuples, datetimes
 
-from orbit_predictor.predictors.base import ONE_SECOND
+from orbit_predictor.predictors.base import ONE_SECOND, PosVel
 from orbit_predictor.exceptions import PropagationError
 from orbit_predictor.locations import Location, ARG
 from orbit_predictor.predictors import TLEPredictor
@@ -57,6 +58,13 @@ class AccuratePredictorTests(TestCase):
         self.predictor = TLEPredictor(SATE_ID, self.db)
         self.end = self.start + dt.timedelta(days=5)
 
+    def test_propagate_eci_returns_arrays(self):
+        result = self.predictor._propagate_eci(self.start)
+
+        assert isinstance(result, PosVel)
+        assert isinstance(result.pos, np.ndarray) and result.pos.shape == (3,)
+        assert isinstance(result.vel, np.ndarray) and result.vel.shape == (3,)
+
     def test_predicted_passes_are_equal_between_executions(self):
         location = Location('bad-case-1', 11.937501570612568,
                             -55.35189435098657, 1780.674044538666)
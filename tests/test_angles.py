@@ -73,6 +73,62 @@ class AnglesTests(TestCase):
 
             self.assertAlmostEqual(degrees(M), expected_M, places=1)
 
+    def test_mean_to_eccentric_converges_for_high_eccentricity(self):
+        for ecc in [0.1, 0.9, 0.99, 0.999]:
+            for M in np.linspace(-20, 20, 401):
+                E = angles.M_to_E(M, ecc)
+
+                self.assertAlmostEqual(E - ecc * np.sin(E), M, places=12)
+
+            E = angles.M_to_E_array(np.linspace(-20, 20, 401), ecc)
+            assert_allclose(E - ecc * np.sin(E), np.linspace(-20, 20, 401), atol=1e-12)
+
+    def test_mean_to_eccentric_array_with_eccentricity_array(self):
+        M = np.linspace(-20, 20, 401)
+        ecc = np.linspace(0, 0.95, 401)
+
+        E = angles.M_to_E_array(M, ecc)
+
+        expected_E = [angles.M_to_E(M_i, ecc_i) for M_i, ecc_i in zip(M, ecc)]
+        assert_allclose(E, expected_E, rtol=1e-13, atol=1e-13)
+
+    def test_mean_to_eccentric_array_with_empty_eccentricity_array(self):
+        E = angles.M_to_E_array(np.empty(0), np.empty(0))
+
+        assert E.shape == (0,)
+
+    def test_mean_to_true_array_matches_scalar(self):
+        for ecc in [0.0, 0.001, 0.14, 0.48, 0.75]:
+            M = np.linspace(-4 * np.pi, 4 * np.pi, 201)
+
+            ta = angles.M_to_ta_array(M, ecc)
+
+            expected_ta = [angles.M_to_ta(M_i, ecc) for M_i in M]
+            assert_allclose(ta, expected_ta, rtol=1e-12, atol=1e-12)
+
+    def test_mean_to_eccentric_interp_matches_newton(self):
+        for ecc in [0.0, 0.001, 0.14, 0.29, 0.3, 0.48, 0.75, 0.85, 0.89, 0.899]:
+            E_grid = angles.kepler_grid(ecc)
+
+            for M in np.linspace(-4 * np.pi, 4 * np.pi, 2001):
+                self.assertAlmostEqual(
+                    angles.M_to_E_interp(M, ecc, E_grid), angles.M_to_E(M, ecc), places=13)
+
+    def test_mean_to_eccentric_warm_matches_newton(self):
+        for ecc in [0.0, 0.001, 0.14, 0.48, 0.75, 0.95]:
+            E_grid = angles.kepler_grid(ecc) if ecc < 0.9 else np.empty(0)
+            state = angles.warm_start_state(ecc)
+            max_delta_M = state[4]
+
+            for M in np.arange(-np.pi, np.pi, 2 * np.pi / 37):
+                # Short arcs, warm started after the first point
+                for M_i in M + max_delta_M * np.arange(-100, 100):
+                    E, sinE, cosE = angles.M_to_E_warm(M_i, ecc, E_grid, state)
+
+                    self.assertAlmostEqual(E, angles.M_to_E(M_i, ecc), places=10)
+                    self.assertAlmostEqual(sinE, np.sin(E), places=15)
+                    self.assertAlmostEqual(cosE, np.cos(E), places=15)
+
 
 class RotateTests(TestCase):
     def test_rotate_simple(self):
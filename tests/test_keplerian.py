@@ -9,7 +9,10 @@ from numpy.testing import assert_allclose
 
 from sgp4.earth_gravity import wgs84
 
-from orbit_predictor.keplerian import coe2rv, rv2coe
+from orbit_predictor.angles import ta_to_E
+from orbit_predictor.keplerian import (
+    coe2rv, coe2rv_from_E, rv2coe, rv_pqw, rotation_pqw_to_eci
+)
 
 
 class COE2RVTests(TestCase):
@@ -31,6 +34,59 @@ class COE2RVTests(TestCase):
         assert_allclose(velocity, expected_velocity, rtol=1e-5)
 
 
+class COE2RVFromETests(TestCase):
+    def test_convert_coe_to_rv_matches_true_anomaly(self):
+        # Data from Vallado, example 2.6
+        p = 11067.790
+        ecc = 0.83285
+        inc = radians(87.87)
+        raan = radians(227.89)
+        argp = radians(53.38)
+
+        for ta in np.radians([0.0, 30.0, 92.335, 179.0, 250.0]):
+            E = ta_to_E(ta, ecc)
+
+            position, velocity = coe2rv_from_E(
+                wgs84.mu, p, ecc, inc, raan, argp, np.sin(E), np.cos(E))
+
+            expected_position, expected_velocity = coe2rv(
+                wgs84.mu, p, ecc, inc, raan, argp, ta)
+            assert_allclose(position, expected_position, rtol=1e-10)
+            assert_allclose(velocity, expected_velocity, rtol=1e-10)
+
+
+class RotationPQWToECITests(TestCase):
+    def test_rotation_matches_coe2rv(self):
+        # Data from Vallado, example 2.6
+        p = 11067.790
+        ecc = 0.83285
+        inc = radians(87.87)
+        raan = radians(227.89)
+        argp = radians(53.38)
+        ta = radians(92.335)
+
+        position_pqw, velocity_pqw = rv_pqw(wgs84.mu, p, ecc, ta)
+        rotation = rotation_pqw_to_eci(inc, raan, argp)
+
+        expected_position, expected_velocity = coe2rv(wgs84.mu, p, ecc, inc, raan, argp, ta)
+        assert_allclose(rotation @ position_pqw, expected_position, rtol=1e-10)
+        assert_allclose(rotation @ velocity_pqw, expected_velocity, rtol=1e-10)
+
+    def test_rotation_pqw_to_eci_scalar_matches_array(self):
+        inc = np.radians([0.0, 28.5, 87.87, 98.6])
+        raan = np.radians([0.0, 67.0, 227.89, 310.0])
+        argp = np.radians([0.0, 355.0, 53.38, 90.0])
+
+        rotations = rotation_pqw_to_eci(inc, raan, argp)
+
+        assert rotations.shape == (len(inc), 3, 3)
+        for inc_i, raan_i, argp_i, expected_rotation in zip(inc, raan, argp, rotations):
+            rotation = rotation_pqw_to_eci(inc_i, raan_i, argp_i)
+
+            assert rotation.shape == (3, 3)
+            assert_allclose(rotation, expected_rotation, rtol=1e-15)
+
+
 class RV2COETests(TestCase):
     def test_convert_rv_to_coe(self):
         # Data from Vallado, example 2.5
@@ -52,3 +108,11 @@ class RV2COETests(TestCase):
         self.assertAlmostEqual(raan, expected_raan, places=3)
         self.assertAlmostEqual(argp, expected_argp, places=3)
         self.assertAlmostEqual(ta, expected_ta, places=5)
+
+    def test_convert_rv_to_coe_from_tuples(self):
+        position = (6524.384, 6862.875, 6448.296)
+        velocity = (4.901327, 5.533756, -1.976341)
+
+        expected_coe = rv2coe(wgs84.mu, np.array(position), np.array(velocity))
+
+        assert_allclose(rv2coe(wgs84.mu, position, velocity), expected_coe, rtol=1e-15)
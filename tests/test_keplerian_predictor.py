@@ -7,6 +7,7 @@ from numpy.testing import assert_allclose
 
 from orbit_predictor.locations import ARG
 from orbit_predictor.predictors import TLEPredictor
+from orbit_predictor.predictors.base import PosVel
 from orbit_predictor.predictors.keplerian import KeplerianPredictor
 from orbit_predictor.sources import MemoryTLESource
 
@@ -97,6 +98,121 @@ class KeplerianPredictorOneDayTests(TestCase):
         assert_allclose(position_eci, expected_position, rtol=1e-2)
         assert_allclose(velocity_eci, expected_velocity, rtol=1e-2)
 
+    def test_propagate_eci_many_matches_scalar(self):
+        dates = [self.epoch + dt.timedelta(minutes=m) for m in range(0, 24 * 60, 7)]
+
+        positions_eci, velocities_eci = self.predictor._propagate_eci_many(dates)
+
+        assert positions_eci.shape == velocities_eci.shape == (len(dates), 3)
+        for when_utc, position_eci, velocity_eci in zip(dates, positions_eci, velocities_eci):
+            expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+            assert_allclose(position_eci, expected_position, rtol=1e-10)
+            assert_allclose(velocity_eci, expected_velocity, rtol=1e-10)
+
+    def test_propagate_eci_returns_position_and_velocity(self):
+        when_utc = self.epoch + dt.timedelta(hours=3)
+
+        result = self.predictor._propagate_eci(when_utc)
+        position_eci, velocity_eci = result
+
+        assert isinstance(result, PosVel)
+        assert result.pos is position_eci
+        assert result.vel is velocity_eci
+        assert isinstance(position_eci, np.ndarray) and position_eci.shape == (3,)
+        assert isinstance(velocity_eci, np.ndarray) and velocity_eci.shape == (3,)
+
+    def test_get_position_accepts_tuples_from_propagate_eci(self):
+        class TuplePredictor(KeplerianPredictor):
+            def _propagate_eci(self, when_utc):
+                position_eci, velocity_eci = super()._propagate_eci(when_utc)
+                return tuple(position_eci), tuple(velocity_eci)
+
+        predictor = TuplePredictor(6780, 0.001, 28.5, 67.0, 355.0, 250.0, self.epoch)
+        when_utc = self.epoch + dt.timedelta(hours=3)
+
+        position = predictor.get_position(when_utc)
+        expected_position = self.predictor.get_position(when_utc)
+
+        assert_allclose(position.position_ecef, expected_position.position_ecef, rtol=1e-12)
+        assert_allclose(position.velocity_ecef, expected_position.velocity_ecef, rtol=1e-12)
+
+    def test_propagate_eci_consecutive_dates(self):
+        dates = [self.epoch + dt.timedelta(seconds=s) for s in range(0, 2 * 3600, 5)]
+
+        positions_eci, velocities_eci = self.predictor._propagate_eci_many(dates)
+
+        for when_utc, expected_position, expected_velocity in zip(
+                dates, positions_eci, velocities_eci):
+            position_eci, velocity_eci = self.predictor._propagate_eci(when_utc)
+
+            assert_allclose(position_eci, expected_position, rtol=1e-10)
+            assert_allclose(velocity_eci, expected_velocity, rtol=1e-10)
+
+    def test_propagate_eci_from_timestamps(self):
+        dates = [self.epoch + dt.timedelta(minutes=m) for m in range(0, 24 * 60, 7)]
+        timestamps = [(date - dt.datetime(1970, 1, 1)).total_seconds() for date in dates]
+
+        positions_eci, velocities_eci = self.predictor._propagate_eci_ts(timestamps)
+
+        for when_utc, ts, position_eci, velocity_eci in zip(
+                dates, timestamps, positions_eci, velocities_eci):
+            expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+            assert_allclose(self.predictor._propagate_eci(ts)[0], expected_position, rtol=1e-9)
+            assert_allclose(self.predictor._propagate_eci(ts)[1], expected_velocity, rtol=1e-9)
+            assert_allclose(position_eci, expected_position, rtol=1e-9)
+            assert_allclose(velocity_eci, expected_velocity, rtol=1e-9)
+
+    def test_propagate_eci_ts_keeps_input_shape(self):
+        ts = (self.epoch - dt.datetime(1970, 1, 1)).total_seconds()
+        timestamps = ts + 600 * np.arange(6.0).reshape(2, 3)
+
+        position_eci, velocity_eci = self.predictor._propagate_eci_ts(ts)
+        positions_eci, velocities_eci = self.predictor._propagate_eci_ts(timestamps)
+
+        assert position_eci.shape == velocity_eci.shape == (3,)
+        assert positions_eci.shape == velocities_eci.shape == (2, 3, 3)
+        assert_allclose(position_eci, self.predictor._propagate_eci(ts)[0], rtol=1e-9)
+        for idx in np.ndindex(timestamps.shape):
+            expected_position, expected_velocity = self.predictor._propagate_eci(timestamps[idx])
+
+            assert_allclose(positions_eci[idx], expected_position, rtol=1e-9)
+            assert_allclose(velocities_eci[idx], expected_velocity, rtol=1e-9)
+
+    def test_propagate_eci_from_numpy_datetime(self):
+        when_utc = self.epoch + dt.timedelta(hours=3)
+
+        position_eci, velocity_eci = self.predictor._propagate_eci(np.datetime64(when_utc))
+        expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+        assert_allclose(position_eci, expected_position, rtol=1e-12)
+        assert_allclose(velocity_eci, expected_velocity, rtol=1e-12)
+
+    def test_propagate_eci_from_integer_timestamp(self):
+        when_utc = self.epoch + dt.timedelta(hours=3)
+        ts = int((when_utc - dt.datetime(1970, 1, 1)).total_seconds())
+
+        position_eci, velocity_eci = self.predictor._propagate_eci(ts)
+        expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+        assert_allclose(position_eci, expected_position, rtol=1e-9)
+        assert_allclose(velocity_eci, expected_velocity, rtol=1e-9)
+
+
+class KeplerianPredictorHighEccentricityTests(TestCase):
+    def test_propagate_eci_without_kepler_grid(self):
+        epoch = dt.datetime(2000, 1, 1, 12, 0)
+        predictor = KeplerianPredictor(26600, 0.95, 63.4, 0.0, 270.0, 0.0, epoch)
+        when_utc = epoch + dt.timedelta(hours=5)
+
+        position_eci, velocity_eci = predictor._propagate_eci(when_utc)
+        expected_position, expected_velocity = predictor._propagate_eci_many([when_utc])
+
+        assert len(predictor._E_grid) == 0
+        assert_allclose(position_eci, expected_position[0], rtol=1e-10)
+        assert_allclose(velocity_eci, expected_velocity[0], rtol=1e-10)
+
 
 class TLEConversionTests(TestCase):
 
@@ -1,11 +1,16 @@
 import datetime as dt
-from unittest import TestCase
+from unittest import TestCase, skipIf
 
 import numpy as np
 from numpy.testing import assert_allclose
 
+from orbit_predictor.angles import warm_start_state
 from orbit_predictor.locations import ARG
-from orbit_predictor.predictors.numerical import J2Predictor, InvalidOrbitError
+from orbit_predictor.predictors.base import PosVel
+from orbit_predictor.predictors.numerical import (
+    J2Constellation, J2Predictor, InvalidOrbitError, sun_sync_plane_constellation,
+    OMEGA, _epoch_from_ltan, _orbital_elements_for_sun_sync, pkepler_c, pkepler_precomp
+)
 
 
 class J2PredictorTests(TestCase):
@@ -34,6 +39,123 @@ class J2PredictorTests(TestCase):
         assert_allclose(position_eci, expected_position, rtol=1e-2)
         assert_allclose(velocity_eci, expected_velocity, rtol=1e-2)
 
+    def test_propagate_eci_many_matches_scalar(self):
+        dates = [self.epoch + dt.timedelta(minutes=m) for m in range(0, 24 * 60, 7)]
+
+        positions_eci, velocities_eci = self.predictor._propagate_eci_many(dates)
+
+        assert positions_eci.shape == velocities_eci.shape == (len(dates), 3)
+        for when_utc, position_eci, velocity_eci in zip(dates, positions_eci, velocities_eci):
+            expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+            assert_allclose(position_eci, expected_position, rtol=1e-10)
+            assert_allclose(velocity_eci, expected_velocity, rtol=1e-10)
+
+    def test_propagate_eci_consecutive_dates(self):
+        dates = [self.epoch + dt.timedelta(seconds=s) for s in range(0, 2 * 3600, 5)]
+
+        positions_eci, velocities_eci = self.predictor._propagate_eci_many(dates)
+
+        for when_utc, expected_position, expected_velocity in zip(
+                dates, positions_eci, velocities_eci):
+            position_eci, velocity_eci = self.predictor._propagate_eci(when_utc)
+
+            assert_allclose(position_eci, expected_position, rtol=1e-10)
+            assert_allclose(velocity_eci, expected_velocity, rtol=1e-10)
+
+    def test_specialized_kernel_matches_generic(self):
+        pred = self.predictor
+        specialized = J2Predictor(6780, 0.001, 28.5, 67.0, 355.0, 250.0, self.epoch).specialize()
+        state = warm_start_state(pred._ecc)
+
+        for delta_t_sec in np.linspace(-86400, 86400, 1001):
+            position_eci, velocity_eci = specialized._pkepler_specialized(
+                delta_t_sec, specialized._E_grid, specialized._kepler_state)
+            expected_position, expected_velocity = pkepler_precomp(
+                pred._M_0, pred._M_dot, pred._raan_rad, pred._raan_rate,
+                pred._argp_rad, pred._argp_rate, pred._ecc, pred._inc_rad, pred._p,
+                delta_t_sec, pred._E_grid, state
+            )
+
+            assert_allclose(position_eci, expected_position, rtol=1e-10)
+            assert_allclose(velocity_eci, expected_velocity, rtol=1e-10)
+
+    def test_propagate_eci_returns_arrays(self):
+        when_utc = self.epoch + dt.timedelta(hours=3)
+        specialized = J2Predictor(6780, 0.001, 28.5, 67.0, 355.0, 250.0, self.epoch).specialize()
+
+        for pred in [self.predictor, specialized]:
+            result = pred._propagate_eci(when_utc)
+
+            assert isinstance(result, PosVel)
+            assert isinstance(result.pos, np.ndarray) and result.pos.shape == (3,)
+            assert isinstance(result.vel, np.ndarray) and result.vel.shape == (3,)
+
+    def test_propagate_eci_uses_specialized_kernel(self):
+        when_utc = self.epoch + dt.timedelta(hours=3)
+        specialized = J2Predictor(6780, 0.001, 28.5, 67.0, 355.0, 250.0, self.epoch).specialize()
+        calls = []
+
+        kernel = specialized._pkepler_specialized
+        specialized._pkepler_specialized = lambda *args: calls.append(args) or kernel(*args)
+
+        position_eci, velocity_eci = specialized._propagate_eci(when_utc)
+        expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+        assert len(calls) == 1
+        assert_allclose(position_eci, expected_position, rtol=1e-10)
+        assert_allclose(velocity_eci, expected_velocity, rtol=1e-10)
+
+    def test_propagate_eci_from_timestamps(self):
+        dates = [self.epoch + dt.timedelta(minutes=m) for m in range(0, 24 * 60, 7)]
+        timestamps = [(date - dt.datetime(1970, 1, 1)).total_seconds() for date in dates]
+
+        positions_eci, velocities_eci = self.predictor._propagate_eci_ts(timestamps)
+
+        for when_utc, ts, position_eci, velocity_eci in zip(
+                dates, timestamps, positions_eci, velocities_eci):
+            expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+            assert_allclose(self.predictor._propagate_eci(ts)[0], expected_position, rtol=1e-9)
+            assert_allclose(self.predictor._propagate_eci(ts)[1], expected_velocity, rtol=1e-9)
+            assert_allclose(position_eci, expected_position, rtol=1e-9)
+            assert_allclose(velocity_eci, expected_velocity, rtol=1e-9)
+
+    def test_propagate_eci_ts_keeps_input_shape(self):
+        ts = (self.epoch - dt.datetime(1970, 1, 1)).total_seconds()
+        timestamps = ts + 600 * np.arange(6.0).reshape(2, 3)
+
+        position_eci, velocity_eci = self.predictor._propagate_eci_ts(ts)
+        positions_eci, velocities_eci = self.predictor._propagate_eci_ts(timestamps)
+
+        assert position_eci.shape == velocity_eci.shape == (3,)
+        assert positions_eci.shape == velocities_eci.shape == (2, 3, 3)
+        assert_allclose(position_eci, self.predictor._propagate_eci(ts)[0], rtol=1e-9)
+        for idx in np.ndindex(timestamps.shape):
+            expected_position, expected_velocity = self.predictor._propagate_eci(timestamps[idx])
+
+            assert_allclose(positions_eci[idx], expected_position, rtol=1e-9)
+            assert_allclose(velocities_eci[idx], expected_velocity, rtol=1e-9)
+
+    def test_propagate_eci_from_numpy_datetime(self):
+        when_utc = self.epoch + dt.timedelta(hours=3)
+
+        position_eci, velocity_eci = self.predictor._propagate_eci(np.datetime64(when_utc))
+        expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+        assert_allclose(position_eci, expected_position, rtol=1e-12)
+        assert_allclose(velocity_eci, expected_velocity, rtol=1e-12)
+
+    def test_propagate_eci_from_integer_timestamp(self):
+        when_utc = self.epoch + dt.timedelta(hours=3)
+        ts = int((when_utc - dt.datetime(1970, 1, 1)).total_seconds())
+
+        position_eci, velocity_eci = self.predictor._propagate_eci(ts)
+        expected_position, expected_velocity = self.predictor._propagate_eci(when_utc)
+
+        assert_allclose(position_eci, expected_position, rtol=1e-9)
+        assert_allclose(velocity_eci, expected_velocity, rtol=1e-9)
+
     def test_get_next_pass(self):
         pass_ = self.predictor.get_next_pass(ARG)
 
@@ -68,6 +190,26 @@ class SunSynchronousTests(TestCase):
         pred = J2Predictor.sun_synchronous(ecc=0.2, inc_deg=98.6)
         self.assertAlmostEqual(pred._sma, expected_sma, places=1)
 
+    def test_sun_sync_secular_raan_rate_follows_the_sun(self):
+        for pred in [
+            J2Predictor.sun_synchronous(alt_km=800, ecc=0),
+            J2Predictor.sun_synchronous(alt_km=475, inc_deg=97),
+            J2Predictor.sun_synchronous(ecc=0.2, inc_deg=98.6),
+        ]:
+            self.assertAlmostEqual(pred._raan_rate / OMEGA, 1.0, places=12)
+
+    def test_sun_sync_reuses_orbit_solution(self):
+        date = dt.date(2019, 5, 23)
+        J2Predictor.sun_synchronous(alt_km=700, ecc=0, date=date)
+        hits = _orbital_elements_for_sun_sync.cache_info().hits
+        epoch_hits = _epoch_from_ltan.cache_info().hits
+
+        J2Predictor.sun_synchronous(alt_km=700, ecc=0, date=date, ta_deg=90)
+        J2Predictor.sun_synchronous(alt_km=700, ecc=0, date=date, ltan_h=18)
+
+        self.assertEqual(_orbital_elements_for_sun_sync.cache_info().hits, hits + 2)
+        self.assertEqual(_epoch_from_ltan.cache_info().hits, epoch_hits + 1)
+
     def test_sun_sync_delta_true_anomaly_has_expected_anomaly_and_epoch(self):
         date = dt.datetime.today().date()
         ltan_h = 12
@@ -93,3 +235,85 @@ class SunSynchronousTests(TestCase):
 
             self.assertEqual(pred._ta, ta_deg)
             self.assertEqual(pred._epoch, expected_ref_epoch)
+
+
+class SunSyncPlaneConstellationTests(TestCase):
+    def test_constellation_matches_sun_synchronous(self):
+        date = dt.date(2019, 5, 23)
+
+        preds = list(sun_sync_plane_constellation(
+            4, alt_km=475, ecc=0.001, ltan_h=10.5, date=date))
+
+        assert [pred._ta for pred in preds] == [0, 90, 180, 270]
+        for pred in preds:
+            expected = J2Predictor.sun_synchronous(
+                alt_km=475, ecc=0.001, ltan_h=10.5, date=date, ta_deg=pred._ta)
+
+            self.assertEqual(pred._sma, expected._sma)
+            self.assertEqual(pred._inc, expected._inc)
+            self.assertEqual(pred._raan, expected._raan)
+            self.assertEqual(pred._epoch, expected._epoch)
+
+    def test_constellation_invalid_parameters_raises_error(self):
+        self.assertRaises(
+            InvalidOrbitError, list, sun_sync_plane_constellation(3, alt_km=400, inc_deg=90))
+
+
+class J2ConstellationTests(TestCase):
+    def setUp(self):
+        self.epoch = dt.datetime(2000, 1, 1, 12, 0)
+        self.predictors = [
+            J2Predictor(6780, 0.001, 28.5, 67.0, 355.0, 250.0, self.epoch),
+            J2Predictor(7000, 0.1, 98.0, 120.0, 10.0, 0.0, self.epoch + dt.timedelta(hours=2)),
+        ] + list(sun_sync_plane_constellation(3, alt_km=475, ecc=0.001, date=self.epoch.date()))
+
+    def test_propagate_all_matches_predictors(self):
+        dates = [self.epoch + dt.timedelta(minutes=m) for m in range(0, 24 * 60, 37)]
+        timestamps = [(date - dt.datetime(1970, 1, 1)).total_seconds() for date in dates]
+        constellation = J2Constellation.from_predictors(self.predictors)
+
+        positions_eci, velocities_eci = constellation.propagate_all(timestamps)
+
+        assert len(constellation) == len(self.predictors)
+        assert positions_eci.shape == velocities_eci.shape == (
+            len(self.predictors), len(dates), 3)
+        for pred, positions, velocities in zip(self.predictors, positions_eci, velocities_eci):
+            expected_positions, expected_velocities = pred._propagate_eci_many(dates)
+
+            assert_allclose(positions, expected_positions, rtol=1e-9)
+            assert_allclose(velocities, expected_velocities, rtol=1e-9)
+
+    def test_propagate_all_without_numba_matches_kernel(self):
+        timestamps = np.linspace(946728000, 946728000 + 86400, 97)
+        constellation = J2Constellation.from_predictors(self.predictors)
+        delta_t_sec = timestamps[None, :] - constellation._epoch_ts[:, None]
+
+        positions_eci, velocities_eci = constellation._propagate_all_array(delta_t_sec)
+        expected_positions, expected_velocities = constellation.propagate_all(timestamps)
+
+        assert_allclose(positions_eci, expected_positions, rtol=1e-9)
+        assert_allclose(velocities_eci, expected_velocities, rtol=1e-9)
+
+
+@skipIf(pkepler_c is None, "Compiled extension not available")
+class CompiledPKeplerTests(TestCase):
+    def test_compiled_kernel_matches_numba(self):
+        pred = J2Predictor(7000, 0.1, 98.0, 120.0, 10.0, 30.0, dt.datetime(2000, 1, 1, 12, 0))
+
+        for E_grid in [pred._E_grid, np.empty(0)]:
+            state_c, state = warm_start_state(pred._ecc), warm_start_state(pred._ecc)
+            for delta_t_sec in np.linspace(-3600, 3600, 7201):
+                args = (
+                    pred._M_0, pred._M_dot, pred._raan_rad, pred._raan_rate,
+                    pred._argp_rad, pred._argp_rate, pred._ecc, pred._inc_rad, pred._p,
+                    delta_t_sec, E_grid
+                )
+
+                position_eci, velocity_eci = pkepler_c(*args, state_c)
+                expected_position, expected_velocity = pkepler_precomp(*args, state)
+
+                assert isinstance(position_eci, np.ndarray)
+                assert isinstance(velocity_eci, np.ndarray)
+
+                assert_allclose(position_eci, expected_position, rtol=1e-10)
+                assert_allclose(velocity_eci, expected_velocity, rtol=1e-10)